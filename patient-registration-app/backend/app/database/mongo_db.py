@@ -2,29 +2,57 @@
 MongoDB Database Connection Module
 
 This module provides functionality for connecting to MongoDB and accessing
-collections. It uses the motor library for asynchronous MongoDB operations.
+collections. It uses PyMongo's native asyncio client (AsyncMongoClient) for
+asynchronous MongoDB operations.
 
 The module initializes a connection to MongoDB on application startup and
-provides functions to access the database and collections.
+provides functions to access the database and collections. Patient documents
+are written through a background writer that batches them into insert_many
+calls instead of issuing one insert per request.
 """
 
+import asyncio
+import logging
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Any, Dict, List
+from pymongo import AsyncMongoClient
 from pymongo.errors import ConnectionFailure
 
 # MongoDB connection string from environment variable or default for development
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://mongo:27017")
 DB_NAME = os.getenv("MONGO_DB_NAME", "patient_db")
 
-# MongoDB client and database instances (initialized in init_mongodb)
+# Maximum number of pooled MongoDB connections per worker process
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 20))
+# Number of MongoDB connections kept open (and opened at startup) per worker
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 10))
+
+# Background writer batching: flush when this many documents are queued, or
+# this many milliseconds after the first queued document, whichever is first
+MONGO_WRITE_BATCH_SIZE = int(os.getenv("MONGO_WRITE_BATCH_SIZE", 500))
+MONGO_WRITE_FLUSH_MS = int(os.getenv("MONGO_WRITE_FLUSH_MS", 50))
+# Upper bound on queued documents, so an unreachable MongoDB cannot grow memory without limit
+MONGO_WRITE_QUEUE_SIZE = int(os.getenv("MONGO_WRITE_QUEUE_SIZE", 10_000))
+# Longest time shutdown waits for queued documents to be written
+MONGO_WRITE_DRAIN_TIMEOUT_S = float(os.getenv("MONGO_WRITE_DRAIN_TIMEOUT_S", 10))
+
+logger = logging.getLogger(__name__)
+
+# MongoDB client, database and patients collection (initialized in init_mongodb).
+# The collection is bound once here rather than looked up on every write.
 client = None
 db = None
+patients_collection = None
+
+# Background writer queue and task (started in init_mongodb)
+write_queue = None
+writer_task = None
 
 async def init_mongodb():
     """
     Initialize the MongoDB connection.
 
-    This function creates an AsyncIOMotorClient instance and connects to the
+    This function creates an AsyncMongoClient instance and connects to the
     specified MongoDB database. It verifies the connection with a ping command.
 
     The function sets the global client and db variables that are used by
@@ -33,28 +61,48 @@ async def init_mongodb():
     Raises:
         ConnectionFailure: If the connection to MongoDB fails
     """
-    global client, db
+    global client, db, patients_collection
     try:
-        # Create AsyncIOMotorClient instance
-        client = AsyncIOMotorClient(MONGO_URL)
+        # Create AsyncMongoClient instance
+        client = AsyncMongoClient(
+            MONGO_URL,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+        )
 
         # Verify connection by sending a ping command to the server
         await client.admin.command('ping')
 
         # Get database instance
         db = client[DB_NAME]
-        print("Connected to MongoDB")
+        patients_collection = db.patients
+        logger.info("Connected to MongoDB")
+
+        # Start the background writer for patient documents
+        start_patient_writer()
     except ConnectionFailure:
-        print("MongoDB connection failed")
+        logger.error("MongoDB connection failed")
         # In a production environment, you might want to implement retry logic
         # or raise an exception to prevent the application from starting
 
+async def warm_mongodb_pool():
+    """
+    Open pooled MongoDB connections ahead of the first request.
+
+    This function sends MONGO_MIN_POOL_SIZE concurrent ping commands so the
+    driver opens that many connections at startup. It does nothing if the
+    MongoDB connection could not be established.
+    """
+    if client is None or db is None:
+        return
+    await asyncio.gather(*[client.admin.command('ping') for _ in range(MONGO_MIN_POOL_SIZE)])
+
 def get_mongodb():
     """
     Get the MongoDB database instance.
 
     Returns:
-        AsyncIOMotorDatabase: The MongoDB database instance, or None if not connected
+        AsyncDatabase: The MongoDB database instance, or None if not connected
     """
     return db
 
@@ -66,17 +114,121 @@ def get_patients_collection():
     It's used to perform CRUD operations on patient documents.
 
     Returns:
-        AsyncIOMotorCollection: The patients collection, or None if not connected
+        AsyncCollection: The patients collection, or None if not connected
     """
-    return db.patients if db else None
+    return patients_collection
+
+def start_patient_writer():
+    """
+    Start the background task that writes queued patient documents.
+    """
+    global write_queue, writer_task
+    write_queue = asyncio.Queue(maxsize=MONGO_WRITE_QUEUE_SIZE)
+    writer_task = asyncio.create_task(_write_patients_forever())
+
+def enqueue_patient_documents(documents: List[Dict[str, Any]]) -> bool:
+    """
+    Queue patient documents for the background writer.
+
+    This call never waits on MongoDB; the documents are written in a later
+    batch. If the writer has fallen so far behind that the queue cannot hold
+    every document, as many as fit are queued and the rest are dropped with
+    a warning - PostgreSQL remains the primary data store.
+
+    Args:
+        documents (List[Dict[str, Any]]): The patient documents to store
+
+    Returns:
+        bool: False if MongoDB is not connected and nothing was queued
+    """
+    if write_queue is None:
+        return False
+    free = write_queue.maxsize - write_queue.qsize()
+    for document in documents[:free]:
+        write_queue.put_nowait(document)
+    if len(documents) > free:
+        logger.warning(
+            "MongoDB write queue full, dropped %d of %d documents",
+            len(documents) - free,
+            len(documents),
+        )
+    return True
+
+async def _write_patients_forever():
+    """
+    Drain the write queue in batches until cancelled.
+
+    Each batch starts with the next queued document and collects more until
+    MONGO_WRITE_BATCH_SIZE documents are gathered or MONGO_WRITE_FLUSH_MS
+    have passed, then writes them with one insert_many call.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await write_queue.get()]
+        deadline = loop.time() + MONGO_WRITE_FLUSH_MS / 1000
+        while len(batch) < MONGO_WRITE_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(write_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        await _insert_patient_batch(batch)
+        for _ in batch:
+            write_queue.task_done()
+
+async def _insert_patient_batch(batch: List[Dict[str, Any]]):
+    """
+    Write one batch of patient documents to MongoDB.
+
+    Errors are reported and the batch is dropped - PostgreSQL is the primary
+    data store, so a failed MongoDB copy must not stop the writer.
+
+    Args:
+        batch (List[Dict[str, Any]]): The patient documents to insert
+    """
+    try:
+        await patients_collection.insert_many(batch, ordered=False)
+    except Exception as e:
+        logger.error("Error inserting into MongoDB: %s", e)
+
+async def stop_patient_writer():
+    """
+    Stop the background writer once every queued document has been written.
+
+    The drain is bounded by MONGO_WRITE_DRAIN_TIMEOUT_S so an unreachable
+    MongoDB cannot stall shutdown until the process is killed; documents
+    still queued at that point are reported and dropped.
+    """
+    global write_queue, writer_task
+    if writer_task is None:
+        return
+    try:
+        await asyncio.wait_for(write_queue.join(), MONGO_WRITE_DRAIN_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        logger.warning(
+            "MongoDB writer did not drain within %ss, dropping %d queued documents",
+            MONGO_WRITE_DRAIN_TIMEOUT_S,
+            write_queue.qsize(),
+        )
+    writer_task.cancel()
+    try:
+        await writer_task
+    except asyncio.CancelledError:
+        pass
+    write_queue = None
+    writer_task = None
 
 async def close_mongodb_connection():
     """
     Close the MongoDB connection.
 
     This function should be called when the application is shutting down
-    to properly close the MongoDB connection.
+    to properly close the MongoDB connection. Queued patient documents are
+    written before the connection is closed.
     """
-    if client:
-        client.close()
-        print("MongoDB connection closed")
+    await stop_patient_writer()
+    if client is not None:
+        await client.close()
+        logger.info("MongoDB connection closed")
@@ -11,7 +11,7 @@ The module includes models for:
 - Patient database representation (with additional fields)
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from enum import Enum
 
@@ -33,6 +33,8 @@ class PatientBase(BaseModel):
     This model defines the common fields for all patient-related models.
     It includes validation rules for each field to ensure data integrity.
     """
+    model_config = ConfigDict(str_strip_whitespace=True, validate_assignment=False)
+
     name: str = Field(
         ...,
         min_length=2,
@@ -72,11 +74,10 @@ class Patient(PatientBase):
     This model is used for the response body when returning patient data.
     It includes all fields from PatientBase plus the patient ID.
     """
-    id: int = Field(..., description="Unique identifier for the patient")
+    # Allows the model to be validated from ORM objects and other attribute containers
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        """Configuration for the Patient model."""
-        orm_mode = True  # Allows the model to work with ORM objects
+    id: int = Field(..., description="Unique identifier for the patient")
 
 class PatientInDB(Patient):
     """
@@ -86,11 +87,11 @@ class PatientInDB(Patient):
     It includes all fields from Patient plus additional metadata fields.
     """
     # Additional fields that might be stored in the database
-    created_at: Optional[str] = Field(
+    created_at: Optional[int] = Field(
         None,
-        description="Timestamp when the patient record was created"
+        description="When the patient record was created (nanoseconds since the Unix epoch, UTC)"
     )
-    updated_at: Optional[str] = Field(
+    updated_at: Optional[int] = Field(
         None,
-        description="Timestamp when the patient record was last updated"
+        description="When the patient record was last updated (nanoseconds since the Unix epoch, UTC)"
     )
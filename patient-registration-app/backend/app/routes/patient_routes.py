@@ -9,51 +9,139 @@ Patient data is stored in both PostgreSQL (for relational data) and MongoDB
 (for document-based storage with additional metadata).
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-import datetime
+from cachetools import TTLCache
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import List, Dict, Any, Optional
+import asyncio
+import functools
+import hashlib
+import logging
+import time
+
+import orjson
 
 from app.models.patient import Patient, PatientCreate, PatientInDB
-from app.database.postgres_db import get_db, PatientTable
-from app.database.mongo_db import get_patients_collection
+from app.database.postgres_db import get_db, get_session_factory, PatientTable
+from app.database.mongo_db import enqueue_patient_documents, MONGO_WRITE_BATCH_SIZE
 
 # Create API router
 router = APIRouter()
 
-def patient_to_dict(patient: PatientTable) -> Dict[str, Any]:
+logger = logging.getLogger(__name__)
+
+# In-process cache of patient records served by read_patient, keyed by ID.
+# Patient records are not modified after creation; any future update or
+# delete route must pop the affected ID from this cache.
+patient_cache = TTLCache(maxsize=10_000, ttl=60)
+
+# Largest batch accepted by POST /patients/bulk. Capped at one MongoDB writer
+# batch so a single request can never overflow the MongoDB write queue alone.
+MAX_BULK_PATIENTS = MONGO_WRITE_BATCH_SIZE
+
+# Browser/client cache policy for a single patient record. "private" keeps
+# shared proxies from storing patient data.
+PATIENT_CACHE_CONTROL = "private, max-age=30"
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check whether an If-None-Match header matches an entity tag.
+
+    Weak comparison is used, as RFC 9110 requires for If-None-Match.
+
+    Args:
+        if_none_match (Optional[str]): The raw If-None-Match header value
+        etag (str): The current (quoted) entity tag
+
+    Returns:
+        bool: True if the client's cached copy is still current
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def singleflight(func):
+    """
+    Coalesce concurrent calls to a coroutine function that share a key.
+
+    The first positional argument is used as the key. While a call for a key
+    is in flight, further callers with the same key await that call's result
+    instead of starting their own, so N concurrent requests cost one query.
+
+    Args:
+        func: The coroutine function to wrap
+
+    Returns:
+        The wrapped coroutine function
+    """
+    inflight: Dict[Any, asyncio.Task] = {}
+
+    @functools.wraps(func)
+    async def wrapper(key, *args, **kwargs):
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(key, *args, **kwargs))
+            inflight[key] = task
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+        # Shield so one cancelled caller does not cancel the shared call
+        return await asyncio.shield(task)
+
+    return wrapper
+
+# Patient columns returned by the API. Selecting (or RETURNING) plain columns
+# yields Core rows, skipping ORM instance construction and identity-map
+# bookkeeping.
+patient_columns = (
+    PatientTable.id,
+    PatientTable.name,
+    PatientTable.age,
+    PatientTable.gender,
+    PatientTable.contact,
+)
+patient_select = select(*patient_columns)
+
+@singleflight
+async def load_patient(patient_id: int, session_factory: async_sessionmaker) -> Optional[Dict[str, Any]]:
     """
-    Convert a SQLAlchemy PatientTable model to a dictionary.
+    Load a patient from PostgreSQL and store it in the patient cache.
 
-    This helper function converts a SQLAlchemy model instance to a dictionary
-    that can be used with Pydantic models and for JSON serialization.
+    Concurrent loads of the same ID are coalesced into a single query. The
+    shared load opens its own session instead of using any one request's,
+    so it is unaffected if the request that started it goes away.
 
     Args:
-        patient (PatientTable): The SQLAlchemy model instance to convert
+        patient_id (int): The ID of the patient to load
+        session_factory (async_sessionmaker): Factory for the query's session
 
     Returns:
-        Dict[str, Any]: Dictionary representation of the patient
+        Optional[Dict[str, Any]]: The patient record, or None if it does not exist
     """
-    return {
-        "id": patient.id,
-        "name": patient.name,
-        "age": patient.age,
-        "gender": patient.gender,
-        "contact": patient.contact
-    }
+    async with session_factory() as db:
+        result = await db.execute(patient_select.where(PatientTable.id == patient_id))
+        patient = result.mappings().first()
+    if patient is None:
+        return None
+    patient_cache[patient_id] = dict(patient)
+    return patient_cache[patient_id]
 
 @router.post("/patients/", response_model=Patient, status_code=status.HTTP_201_CREATED)
-async def create_patient(patient: PatientCreate, db: Session = Depends(get_db)):
+async def create_patient(patient: PatientCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a new patient record.
 
     This endpoint creates a new patient record in both PostgreSQL and MongoDB.
     The primary data is stored in PostgreSQL, while a copy with additional
-    metadata (like creation timestamp) is stored in MongoDB.
+    metadata (like creation timestamp) is stored in MongoDB. The MongoDB copy
+    is queued for the background batch writer so the response does not wait
+    for it.
 
     Args:
         patient (PatientCreate): The patient data from the request body
-        db (Session): The database session (injected by FastAPI)
+        db (AsyncSession): The database session (injected by FastAPI)
 
     Returns:
         Patient: The created patient record
@@ -61,68 +149,142 @@ async def create_patient(patient: PatientCreate, db: Session = Depends(get_db)):
     Raises:
         HTTPException: If there's an error creating the patient record
     """
-    # Create patient in PostgreSQL
-    db_patient = PatientTable(
-        name=patient.name,
-        age=patient.age,
-        gender=patient.gender.value,
-        contact=patient.contact
+    # Create patient in PostgreSQL with a single INSERT ... RETURNING round-trip
+    result = await db.execute(
+        insert(PatientTable)
+        .values(**patient.model_dump(mode="json"))
+        .returning(*patient_columns)
+    )
+    created = dict(result.mappings().one())
+    await db.commit()
+
+    # Queue patient for MongoDB (with error handling)
+    try:
+        patient_data = dict(created)
+        patient_data["created_at"] = time.time_ns()
+        if not enqueue_patient_documents([patient_data]):
+            logger.warning("MongoDB is not connected, skipping MongoDB insert")
+    except Exception as e:
+        logger.error("Error inserting into MongoDB: %s", e)
+        # Continue even if MongoDB insert fails - PostgreSQL is the primary data store
+
+    return created
+
+@router.post("/patients/bulk", response_model=List[Patient], status_code=status.HTTP_201_CREATED)
+async def create_patients_bulk(
+    patients: List[PatientCreate] = Body(..., max_length=MAX_BULK_PATIENTS),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create several patient records in one request.
+
+    The rows are sent to PostgreSQL as one executemany INSERT ... RETURNING,
+    which SQLAlchemy batches into multi-row statements, instead of one
+    round-trip per patient. Copies are queued for the background MongoDB
+    batch writer.
+
+    At most MAX_BULK_PATIENTS patients are accepted per request; larger
+    batches are rejected with a 422 before anything is written.
+
+    Args:
+        patients (List[PatientCreate]): The patient data from the request body
+        db (AsyncSession): The database session (injected by FastAPI)
+
+    Returns:
+        List[Patient]: The created patient records, in request order
+    """
+    if not patients:
+        return []
+
+    result = await db.execute(
+        insert(PatientTable).returning(*patient_columns, sort_by_parameter_order=True),
+        [patient.model_dump(mode="json") for patient in patients],
     )
-    db.add(db_patient)
-    db.commit()
-    db.refresh(db_patient)
+    created = [dict(row) for row in result.mappings().all()]
+    await db.commit()
 
-    # Create patient in MongoDB (with error handling)
     try:
-        mongo_collection = get_patients_collection()
-        if mongo_collection:
-            patient_data = patient_to_dict(db_patient)
-            patient_data["created_at"] = datetime.datetime.now().isoformat()
-            await mongo_collection.insert_one(patient_data)
-        else:
-            print("MongoDB collection is None, skipping MongoDB insert")
+        created_at = time.time_ns()
+        documents = [dict(patient, created_at=created_at) for patient in created]
+        if not enqueue_patient_documents(documents):
+            logger.warning("MongoDB is not connected, skipping MongoDB insert")
     except Exception as e:
-        print(f"Error inserting into MongoDB: {e}")
+        logger.error("Error inserting into MongoDB: %s", e)
         # Continue even if MongoDB insert fails - PostgreSQL is the primary data store
 
-    return patient_to_dict(db_patient)
+    return created
 
-@router.get("/patients/", response_model=List[Patient])
-async def read_patients(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+# The GET routes below return rows straight from our own database, which were
+# validated on the way in, so they skip response_model re-validation and
+# serialize directly. The `responses` metadata keeps the OpenAPI schema.
+@router.get("/patients/", response_model=None, responses={200: {"model": List[Patient]}})
+async def read_patients(
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+):
     """
     Retrieve a list of patients.
 
-    This endpoint retrieves a paginated list of patients from the database.
+    This endpoint retrieves a paginated list of patients from the database,
+    ordered by ID. Keyset pagination via ``after_id`` is preferred: pass the
+    last ID of the previous page and the primary key index seeks straight to
+    the next page. ``skip`` (OFFSET) is kept for backward compatibility, but
+    the database still reads and discards every skipped row.
 
     Args:
         skip (int, optional): Number of records to skip (for pagination). Defaults to 0.
         limit (int, optional): Maximum number of records to return. Defaults to 100.
-        db (Session): The database session (injected by FastAPI)
+        after_id (int, optional): Only return patients with an ID greater than this.
+        db (AsyncSession): The database session (injected by FastAPI)
 
     Returns:
         List[Patient]: List of patient records
     """
-    patients = db.query(PatientTable).offset(skip).limit(limit).all()
-    return [patient_to_dict(patient) for patient in patients]
+    query = patient_select.order_by(PatientTable.id)
+    if after_id is not None:
+        query = query.where(PatientTable.id > after_id)
+    result = await db.execute(query.offset(skip).limit(limit))
+    return ORJSONResponse([dict(row) for row in result.mappings()])
 
-@router.get("/patients/{patient_id}", response_model=Patient)
-async def read_patient(patient_id: int, db: Session = Depends(get_db)):
+@router.get("/patients/{patient_id}", response_model=None, responses={200: {"model": Patient}})
+async def read_patient(
+    patient_id: int,
+    if_none_match: Optional[str] = Header(None),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+):
     """
     Retrieve a specific patient by ID.
 
-    This endpoint retrieves a single patient record by its ID.
+    This endpoint retrieves a single patient record by its ID. Records are
+    cached in-process for a short time, so repeated reads skip the database,
+    and concurrent cache misses for the same ID share one query.
+
+    Responses carry an ETag and a Cache-Control header. A client that sends
+    back a matching If-None-Match header gets an empty 304 Not Modified.
 
     Args:
         patient_id (int): The ID of the patient to retrieve
-        db (Session): The database session (injected by FastAPI)
+        if_none_match (Optional[str]): The If-None-Match request header
+        session_factory (async_sessionmaker): The session factory (injected by
+            FastAPI); a session is only opened on a cache miss
 
     Returns:
-        Patient: The requested patient record
+        Patient: The requested patient record (or an empty 304 response)
 
     Raises:
         HTTPException: If the patient with the specified ID is not found (404)
     """
-    patient = db.query(PatientTable).filter(PatientTable.id == patient_id).first()
+    patient = patient_cache.get(patient_id)
+    if patient is None:
+        patient = await load_patient(patient_id, session_factory)
     if patient is None:
         raise HTTPException(status_code=404, detail="Patient not found")
-    return patient_to_dict(patient)
+
+    body = orjson.dumps(patient)
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": PATIENT_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.database import mongo_db
+
+# Mock MongoDB collection that records insert_many batches
+class MockCollection:
+    def __init__(self):
+        self.batches = []
+
+    async def insert_many(self, documents, ordered=True):
+        self.batches.append(list(documents))
+
+@pytest.fixture
+def mock_collection(monkeypatch):
+    collection = MockCollection()
+    monkeypatch.setattr(mongo_db, "patients_collection", collection)
+    return collection
+
+def test_enqueue_without_connection():
+    """Test that nothing is queued when MongoDB is not connected"""
+    assert mongo_db.enqueue_patient_documents([{"name": "Test Patient"}]) is False
+
+@pytest.mark.asyncio
+async def test_writer_batches_queued_documents(mock_collection):
+    """Test that queued documents are written together in one insert_many"""
+    mongo_db.start_patient_writer()
+    try:
+        assert mongo_db.enqueue_patient_documents([{"id": 1}, {"id": 2}])
+        assert mongo_db.enqueue_patient_documents([{"id": 3}])
+    finally:
+        await mongo_db.stop_patient_writer()
+
+    assert mock_collection.batches == [[{"id": 1}, {"id": 2}, {"id": 3}]]
+    assert mongo_db.write_queue is None
+
+@pytest.mark.asyncio
+async def test_enqueue_drops_overflow_with_warning(mock_collection, monkeypatch, caplog):
+    """Test that documents beyond the queue's capacity are dropped and reported"""
+    monkeypatch.setattr(mongo_db, "MONGO_WRITE_QUEUE_SIZE", 2)
+    mongo_db.start_patient_writer()
+    try:
+        documents = [{"id": i} for i in range(5)]
+        assert mongo_db.enqueue_patient_documents(documents)
+    finally:
+        await mongo_db.stop_patient_writer()
+
+    assert mock_collection.batches == [[{"id": 0}, {"id": 1}]]
+    assert "MongoDB write queue full, dropped 3 of 5 documents" in caplog.text
+
+@pytest.mark.asyncio
+async def test_stop_writer_gives_up_after_drain_timeout(monkeypatch, caplog):
+    """Test that shutdown does not hang when MongoDB never answers"""
+    class HangingCollection:
+        async def insert_many(self, documents, ordered=True):
+            await asyncio.Event().wait()
+
+    monkeypatch.setattr(mongo_db, "patients_collection", HangingCollection())
+    monkeypatch.setattr(mongo_db, "MONGO_WRITE_BATCH_SIZE", 1)
+    monkeypatch.setattr(mongo_db, "MONGO_WRITE_DRAIN_TIMEOUT_S", 0.05)
+    mongo_db.start_patient_writer()
+    mongo_db.enqueue_patient_documents([{"id": 1}, {"id": 2}, {"id": 3}])
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(mongo_db.stop_patient_writer(), 1)
+
+    assert mongo_db.writer_task is None
+    assert "dropping 2 queued documents" in caplog.text
+
+def test_get_patients_collection_returns_bound_collection(mock_collection):
+    """Test that the collection bound at init is returned without a lookup"""
+    assert mongo_db.get_patients_collection() is mock_collection
@@ -1,56 +1,70 @@
+import asyncio
+
+import httpx
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import pytest_asyncio
+from sqlalchemy import delete, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 
-from app.database.postgres_db import Base, get_db
-from app.database.mongo_db import get_patients_collection
+from app.database.postgres_db import Base, get_db, get_session_factory, PatientTable
+from app.routes.patient_routes import load_patient, patient_cache, MAX_BULK_PATIENTS
 from main import app
 
 # Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-engine = create_engine(
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """Run every test on one loop so the shared aiosqlite connection never crosses loops"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
 
-# Mock MongoDB collection
-class MockCollection:
-    async def insert_one(self, document):
-        return {"inserted_id": "mock_id"}
+@pytest_asyncio.fixture(scope="session", autouse=True)
+async def test_engine():
+    # Create the schema once for the whole session
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    # Closes the aiosqlite worker thread, otherwise the interpreter never exits
+    await engine.dispose()
 
 # Override dependencies
-@pytest.fixture
-def test_db():
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+@pytest_asyncio.fixture(autouse=True)
+async def test_db(test_engine):
     try:
-        yield db
+        yield
     finally:
-        db.close()
-        Base.metadata.drop_all(bind=engine)
+        # Empty the table between tests instead of dropping/recreating the schema
+        async with test_engine.begin() as conn:
+            await conn.execute(delete(PatientTable))
+        patient_cache.clear()
 
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
+async def override_get_db():
+    async with TestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def override_get_patients_collection():
-    return MockCollection()
+def override_get_session_factory():
+    return TestingSessionLocal
 
 app.dependency_overrides[get_db] = override_get_db
-app.dependency_overrides[get_patients_collection] = override_get_patients_collection
+app.dependency_overrides[get_session_factory] = override_get_session_factory
 
-client = TestClient(app)
+@pytest_asyncio.fixture(scope="session")
+async def client():
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        yield client
 
-def test_create_patient():
+@pytest.mark.asyncio
+async def test_create_patient(client):
     """Test creating a new patient"""
-    response = client.post(
+    response = await client.post(
         "/api/patients/",
         json={
             "name": "Test Patient",
@@ -67,10 +81,39 @@ def test_create_patient():
     assert data["contact"] == "1234567890"
     assert "id" in data
 
-def test_read_patients():
+@pytest.mark.asyncio
+async def test_create_patients_bulk(client):
+    """Test creating several patients in one request"""
+    response = await client.post(
+        "/api/patients/bulk",
+        json=[
+            {"name": "Bulk One", "age": 20, "gender": "male", "contact": "1111111111"},
+            {"name": "Bulk Two", "age": 21, "gender": "female", "contact": "2222222222"},
+        ],
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert [p["name"] for p in data] == ["Bulk One", "Bulk Two"]
+    assert data[0]["id"] < data[1]["id"]
+
+    listed = (await client.get("/api/patients/")).json()
+    assert [p["name"] for p in listed] == ["Bulk One", "Bulk Two"]
+
+@pytest.mark.asyncio
+async def test_create_patients_bulk_too_large(client):
+    """Test that oversized bulk requests are rejected without writing anything"""
+    patient = {"name": "Bulk Patient", "age": 20, "gender": "male", "contact": "1111111111"}
+    response = await client.post("/api/patients/bulk", json=[patient] * (MAX_BULK_PATIENTS + 1))
+    assert response.status_code == 422
+
+    listed = (await client.get("/api/patients/")).json()
+    assert listed == []
+
+@pytest.mark.asyncio
+async def test_read_patients(client):
     """Test reading patients list"""
     # First create a patient
-    client.post(
+    await client.post(
         "/api/patients/",
         json={
             "name": "Test Patient",
@@ -81,15 +124,37 @@ def test_read_patients():
     )
 
     # Then get the list
-    response = client.get("/api/patients/")
+    response = await client.get("/api/patients/")
     assert response.status_code == 200
     data = response.json()
     assert len(data) > 0
     assert data[0]["name"] == "Test Patient"
 
-def test_invalid_patient_data():
+@pytest.mark.asyncio
+async def test_read_patients_keyset_pagination(client):
+    """Test paging through patients with after_id"""
+    for name in ["First Patient", "Second Patient", "Third Patient"]:
+        await client.post(
+            "/api/patients/",
+            json={
+                "name": name,
+                "age": 30,
+                "gender": "male",
+                "contact": "1234567890"
+            },
+        )
+
+    first_page = (await client.get("/api/patients/?limit=2")).json()
+    assert [p["name"] for p in first_page] == ["First Patient", "Second Patient"]
+
+    response = await client.get(f"/api/patients/?limit=2&after_id={first_page[-1]['id']}")
+    assert response.status_code == 200
+    assert [p["name"] for p in response.json()] == ["Third Patient"]
+
+@pytest.mark.asyncio
+async def test_invalid_patient_data(client):
     """Test validation for patient data"""
-    response = client.post(
+    response = await client.post(
         "/api/patients/",
         json={
             "name": "T",  # Too short
@@ -108,10 +173,28 @@ def test_invalid_patient_data():
     assert "gender" in error_fields
     assert "contact" in error_fields
 
-def test_read_patient_by_id():
+@pytest.mark.asyncio
+async def test_patient_whitespace_is_stripped(client):
+    """Test that leading/trailing whitespace is stripped from string fields"""
+    response = await client.post(
+        "/api/patients/",
+        json={
+            "name": "  Spaced Patient  ",
+            "age": 28,
+            "gender": "male",
+            "contact": " 1234567890 "
+        },
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert data["name"] == "Spaced Patient"
+    assert data["contact"] == "1234567890"
+
+@pytest.mark.asyncio
+async def test_read_patient_by_id(client):
     """Test reading a specific patient by ID"""
     # First create a patient
-    create_response = client.post(
+    create_response = await client.post(
         "/api/patients/",
         json={
             "name": "Test Patient ID",
@@ -124,7 +207,7 @@ def test_read_patient_by_id():
     patient_id = create_response.json()["id"]
 
     # Then get the specific patient
-    response = client.get(f"/api/patients/{patient_id}")
+    response = await client.get(f"/api/patients/{patient_id}")
     assert response.status_code == 200
     data = response.json()
     assert data["id"] == patient_id
@@ -133,12 +216,123 @@ def test_read_patient_by_id():
     assert data["gender"] == "female"
     assert data["contact"] == "9876543210"
 
-def test_patient_not_found():
+@pytest.mark.asyncio
+async def test_read_patient_etag(client):
+    """Test ETag/Cache-Control headers and 304 on a matching If-None-Match"""
+    create_response = await client.post(
+        "/api/patients/",
+        json={
+            "name": "Etag Patient",
+            "age": 33,
+            "gender": "female",
+            "contact": "5550001111"
+        },
+    )
+    patient_id = create_response.json()["id"]
+
+    response = await client.get(f"/api/patients/{patient_id}")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "private, max-age=30"
+    etag = response.headers["ETag"]
+
+    not_modified = await client.get(
+        f"/api/patients/{patient_id}", headers={"If-None-Match": etag}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+    stale = await client.get(
+        f"/api/patients/{patient_id}", headers={"If-None-Match": '"stale"'}
+    )
+    assert stale.status_code == 200
+    assert stale.json()["name"] == "Etag Patient"
+
+@pytest.mark.asyncio
+async def test_patient_not_found(client):
     """Test 404 response for non-existent patient"""
-    response = client.get("/api/patients/9999")  # ID that doesn't exist
+    response = await client.get("/api/patients/9999")  # ID that doesn't exist
     assert response.status_code == 404
     assert response.json()["detail"] == "Patient not found"
 
+@pytest.mark.asyncio
+async def test_read_patient_served_from_cache(client):
+    """Test that a repeated read by ID is answered from the in-process cache"""
+    create_response = await client.post(
+        "/api/patients/",
+        json={
+            "name": "Cached Patient",
+            "age": 40,
+            "gender": "other",
+            "contact": "5551234567"
+        },
+    )
+    patient_id = create_response.json()["id"]
+    assert (await client.get(f"/api/patients/{patient_id}")).status_code == 200
+
+    # Remove the row behind the cache's back; the cached copy is still served
+    async with TestingSessionLocal() as db:
+        await db.execute(delete(PatientTable))
+        await db.commit()
+
+    response = await client.get(f"/api/patients/{patient_id}")
+    assert response.status_code == 200
+    assert response.json()["name"] == "Cached Patient"
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_share_one_query(client):
+    """Test that concurrent cache misses for the same ID issue a single SELECT"""
+    create_response = await client.post(
+        "/api/patients/",
+        json={
+            "name": "Busy Patient",
+            "age": 50,
+            "gender": "female",
+            "contact": "5559876543"
+        },
+    )
+    patient_id = create_response.json()["id"]
+
+    selects = []
+    def count_selects(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_selects)
+    try:
+        responses = await asyncio.gather(
+            *[client.get(f"/api/patients/{patient_id}") for _ in range(5)]
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_selects)
+
+    assert all(response.status_code == 200 for response in responses)
+    assert len(selects) == 1
+
+@pytest.mark.asyncio
+async def test_shared_load_survives_first_caller_cancel(client):
+    """Test that cancelling the caller that started a shared load does not affect the others"""
+    create_response = await client.post(
+        "/api/patients/",
+        json={
+            "name": "Shared Patient",
+            "age": 45,
+            "gender": "male",
+            "contact": "5552223333"
+        },
+    )
+    patient_id = create_response.json()["id"]
+
+    first = asyncio.create_task(load_patient(patient_id, TestingSessionLocal))
+    second = asyncio.create_task(load_patient(patient_id, TestingSessionLocal))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    patient = await second
+    assert patient["name"] == "Shared Patient"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
 def test_database_error_handling():
     """Test error handling when database operations fail"""
     # This test is simplified to avoid potential issues
@@ -12,11 +12,71 @@ with data stored in both PostgreSQL (for relational data) and MongoDB
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+import asyncio
+import logging
+import logging.handlers
+import os
+import platform
+import queue
+import re
+import sys
 import uvicorn
 
 from app.routes.patient_routes import router as patient_router
-from app.database.postgres_db import init_postgres
-from app.database.mongo_db import init_mongodb
+from app.database.postgres_db import init_postgres, warm_postgres_pool
+from app.database.mongo_db import init_mongodb, warm_mongodb_pool, close_mongodb_connection
+
+def install_event_loop_policy() -> str:
+    """
+    Select the event loop implementation for the server.
+
+    On Linux kernels 5.11+ with the optional uringcore package installed, the
+    io_uring based uringcore loop policy is installed. Otherwise Uvicorn's
+    "auto" setting is used, which picks uvloop whenever it is installed.
+
+    This runs at import time so that Uvicorn reload/worker subprocesses, which
+    re-import this module when they are spawned, pick up the same loop.
+
+    Returns:
+        str: The value to pass as Uvicorn's ``loop`` setting ("none" when the
+        policy has already been installed here)
+    """
+    match = re.match(r"(\d+)\.(\d+)", platform.release())
+    kernel = (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+    if sys.platform == "linux" and kernel >= (5, 11):
+        try:
+            import uringcore
+        except ImportError:
+            pass
+        else:
+            asyncio.set_event_loop_policy(uringcore.EventLoopPolicy())
+            return "none"
+    return "auto"
+
+EVENT_LOOP = install_event_loop_policy()
+
+# Background thread that writes queued log records (started on startup)
+log_listener = None
+
+def start_logging():
+    """
+    Route application log records through a queue to a background thread.
+
+    Handlers on the event loop thread only put records on a queue, so a slow
+    stderr write never blocks request handling. The QueueListener thread does
+    the formatting and writing.
+    """
+    global log_listener
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    log_listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+    root_logger = logging.getLogger()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    log_listener.start()
 
 # Initialize FastAPI application with metadata
 app = FastAPI(
@@ -25,6 +85,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    # Encode JSON responses with orjson instead of the stdlib json module
+    default_response_class=ORJSONResponse,
 )
 
 # Configure Cross-Origin Resource Sharing (CORS)
@@ -39,6 +101,13 @@ app.add_middleware(
 # Register API routers
 app.include_router(patient_router, prefix="/api", tags=["patients"])
 
+@app.on_event("startup")
+async def startup_logging():
+    """
+    Start the background log writer before anything else logs.
+    """
+    start_logging()
+
 @app.on_event("startup")
 async def startup_db_client():
     """
@@ -49,6 +118,24 @@ async def startup_db_client():
     await init_postgres()
     # Initialize MongoDB connection
     await init_mongodb()
+    # Open pooled connections now so early requests skip the connect handshake
+    await asyncio.gather(warm_postgres_pool(), warm_mongodb_pool())
+
+@app.on_event("shutdown")
+async def shutdown_db_client():
+    """
+    Close database connections when the application stops.
+    Queued MongoDB writes are flushed before the connection is closed.
+    """
+    await close_mongodb_connection()
+
+@app.on_event("shutdown")
+async def shutdown_logging():
+    """
+    Flush queued log records and stop the background log writer.
+    """
+    if log_listener is not None:
+        log_listener.stop()
 
 @app.get("/")
 async def root():
@@ -61,5 +148,16 @@ async def root():
     return {"message": "Patient Registration API is running"}
 
 if __name__ == "__main__":
-    # Run the application using Uvicorn server when executed directly
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # Run the application using Uvicorn server when executed directly,
+    # on the event loop chosen above and the httptools HTTP parser
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", 8000)),
+        reload=os.getenv("UVICORN_RELOAD", "true").lower() == "true",
+        # One worker process per CPU unless WEB_CONCURRENCY says otherwise
+        # (ignored when reload is on)
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        loop=EVENT_LOOP,
+        http="httptools",
+    )